@@ -1,9 +1,14 @@
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, BackgroundTasks
-from pydantic import BaseModel, Field
-from typing import Dict, Any, List, Optional
+from fastapi import FastAPI, HTTPException, WebSocket, BackgroundTasks, Depends, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, Field, ValidationError
+from cachetools import TTLCache
+from typing import Dict, Any, List, Optional, Type
 from uuid import uuid4
 import logging
 import asyncio
+import threading
+import orjson
 from datetime import datetime
 
 from engine.graph import WorkflowGraph, GraphDefinition
@@ -23,12 +28,35 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="AI Workflow Engine",
     description="Production-grade workflow engine with summarization pipeline",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+MAX_STORED_RUNS = 10000
+RUN_TTL_SECONDS = 3600
+JOB_CLEANUP_INTERVAL_SECONDS = 3600
+
 graphs_store: Dict[str, WorkflowGraph] = {}
-runs_store: Dict[str, Dict[str, Any]] = {}
+# Completed runs are kept for a limited time; each holds its pre-serialized state response
+runs_store: TTLCache = TTLCache(maxsize=MAX_STORED_RUNS, ttl=RUN_TTL_SECONDS)
+# Sync endpoints run in the threadpool and TTLCache is not thread-safe
+runs_lock = threading.Lock()
 node_registry = NodeRegistry()
+cleanup_task: Optional[asyncio.Task] = None
+
+# Example initial state shown in the API docs for run requests
+INPUT_DATA_EXAMPLE: Dict[str, Any] = {
+    "text": "This is a long document that needs to be summarized...",
+    "max_length": 100,
+    "chunk_size": 50,
+    "chunks": [],
+    "chunk_summaries": [],
+    "merged_summary": "",
+    "refined_summary": "",
+    "current_length": 0,
+    "refinement_iterations": 0,
+    "max_refinement_iterations": 5
+}
 
 
 class CreateGraphRequest(BaseModel):
@@ -45,13 +73,15 @@ class CreateGraphResponse(BaseModel):
 
 class RunGraphRequest(BaseModel):
     graph_id: str = Field(..., description="UUID of the graph to execute")
-    input_data: Dict[str, Any] = Field(..., description="Initial state data")
+    input_data: WorkflowState = Field(
+        ..., description="Initial state data", examples=[INPUT_DATA_EXAMPLE]
+    )
 
 
 class RunGraphResponse(BaseModel):
     run_id: str
     graph_id: str
-    final_state: Dict[str, Any]
+    final_state: WorkflowState
     execution_log: List[Dict[str, Any]]
     status: str
 
@@ -59,14 +89,16 @@ class RunGraphResponse(BaseModel):
 class StateResponse(BaseModel):
     run_id: str
     graph_id: str
-    state: Dict[str, Any]
+    state: WorkflowState
     execution_log: List[Dict[str, Any]]
     timestamp: str
 
 
 class RunAsyncRequest(BaseModel):
     graph_id: str = Field(..., description="UUID of the graph to execute")
-    input_data: Dict[str, Any] = Field(..., description="Initial state data")
+    input_data: WorkflowState = Field(
+        ..., description="Initial state data", examples=[INPUT_DATA_EXAMPLE]
+    )
 
 
 class RunAsyncResponse(BaseModel):
@@ -85,29 +117,79 @@ class JobStatusResponse(BaseModel):
     end_time: Optional[str] = None
 
 
+def json_body(model: Type[BaseModel]):
+    """
+    Build a dependency that decodes and validates the raw request body in
+    a single pydantic-core pass, instead of FastAPI's json.loads followed
+    by validation of the resulting dict.
+    """
+    async def parse(request: Request) -> BaseModel:
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError([
+                {**error, "loc": ("body", *error["loc"])}
+                for error in e.errors(include_url=False)
+            ])
+    
+    return parse
+
+
+def json_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """OpenAPI request body for endpoints that parse their body with json_body."""
+    schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+    # Nested models are already registered as components via the response models
+    schema.pop("$defs", None)
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}}
+        }
+    }
+
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting AI Workflow Engine...")
     graph_id = str(uuid4())
     graph = create_summarization_graph(node_registry)
     graphs_store[graph_id] = graph
-    logger.info(f"Pre-registered summarization workflow with graph_id: {graph_id}")
-    logger.info(f"Available nodes: {list(node_registry.list_nodes())}")
+    logger.info("Pre-registered summarization workflow with graph_id: %s", graph_id)
+    logger.info("Available nodes: %s", node_registry.list_nodes())
+    
+    global cleanup_task
+    cleanup_task = asyncio.create_task(cleanup_jobs_periodically())
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if cleanup_task:
+        cleanup_task.cancel()
+
+
+async def cleanup_jobs_periodically():
+    while True:
+        await asyncio.sleep(JOB_CLEANUP_INTERVAL_SECONDS)
+        job_tracker.cleanup_old_jobs()
 
 
 @app.get("/")
-async def root():
+def root():
+    # TTLCache.__len__ expires entries, so it needs the lock like any other access
+    with runs_lock:
+        completed_runs = len(runs_store)
+    
     return {
         "status": "running",
         "service": "AI Workflow Engine",
         "version": "1.0.0",
         "registered_graphs": len(graphs_store),
-        "completed_runs": len(runs_store)
+        "completed_runs": completed_runs
     }
 
 
 @app.post("/graph/create", response_model=CreateGraphResponse)
-async def create_graph(request: CreateGraphRequest):
+def create_graph(request: CreateGraphRequest):
     try:
         graph_id = str(uuid4())
         graph_def = GraphDefinition(
@@ -117,19 +199,23 @@ async def create_graph(request: CreateGraphRequest):
         )
         graph = WorkflowGraph(graph_def, node_registry)
         graphs_store[graph_id] = graph
-        logger.info(f"Created graph {graph_id} with {len(request.nodes)} nodes")
+        logger.info("Created graph %s with %d nodes", graph_id, len(request.nodes))
         return CreateGraphResponse(
             graph_id=graph_id,
             message="Graph created successfully",
             nodes_count=len(request.nodes)
         )
     except Exception as e:
-        logger.error(f"Failed to create graph: {str(e)}")
+        logger.error("Failed to create graph: %s", e)
         raise HTTPException(status_code=400, detail=f"Graph creation failed: {str(e)}")
 
 
-@app.post("/graph/run", response_model=RunGraphResponse)
-async def run_graph(request: RunGraphRequest):
+@app.post(
+    "/graph/run",
+    response_model=RunGraphResponse,
+    openapi_extra=json_body_openapi(RunGraphRequest)
+)
+def run_graph(request: RunGraphRequest = Depends(json_body(RunGraphRequest))):
     try:
         if request.graph_id not in graphs_store:
             raise HTTPException(
@@ -138,84 +224,91 @@ async def run_graph(request: RunGraphRequest):
             )
         
         graph = graphs_store[request.graph_id]
-        run_id = str(uuid4())
-        logger.info(f"Starting execution run_id={run_id} for graph_id={request.graph_id}")
+        run_id = uuid4().hex
+        logger.info("Starting execution run_id=%s for graph_id=%s", run_id, request.graph_id)
         
-        initial_state = WorkflowState(**request.input_data)
+        initial_state = request.input_data
         final_state, execution_log = graph.execute(initial_state)
         
-        runs_store[run_id] = {
+        # pydantic serializes the state, since client-supplied metadata may
+        # hold values orjson rejects (e.g. integers beyond 64 bits)
+        state_json = final_state.model_dump_json().encode()
+        run_id_json = orjson.dumps(run_id)
+        graph_id_json = orjson.dumps(request.graph_id)
+        log_json = orjson.dumps(execution_log)
+        timestamp = datetime.utcnow().isoformat()
+        run_data = {
             "run_id": run_id,
             "graph_id": request.graph_id,
-            "state": final_state.model_dump(),
-            "execution_log": execution_log,
-            "timestamp": datetime.utcnow().isoformat(),
-            "status": "completed"
+            "timestamp": timestamp,
+            "status": "completed",
+            "body": b'{"run_id":%s,"graph_id":%s,"state":%s,"execution_log":%s,"timestamp":%s}' % (
+                run_id_json, graph_id_json, state_json, log_json, orjson.dumps(timestamp)
+            )
         }
+        with runs_lock:
+            runs_store[run_id] = run_data
         
-        logger.info(f"Completed run_id={run_id} with {len(execution_log)} steps")
+        logger.info("Completed run_id=%s with %d steps", run_id, len(execution_log))
         
-        return RunGraphResponse(
-            run_id=run_id,
-            graph_id=request.graph_id,
-            final_state=final_state.model_dump(),
-            execution_log=execution_log,
-            status="completed"
+        return Response(
+            content=b'{"run_id":%s,"graph_id":%s,"final_state":%s,"execution_log":%s,"status":"completed"}' % (
+                run_id_json, graph_id_json, state_json, log_json
+            ),
+            media_type="application/json"
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Graph execution failed: {str(e)}")
+        logger.error("Graph execution failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Execution failed: {str(e)}")
 
 
 @app.get("/graph/state/{run_id}", response_model=StateResponse)
-async def get_state(run_id: str):
-    if run_id not in runs_store:
+def get_state(run_id: str):
+    with runs_lock:
+        run_data = runs_store.get(run_id)
+    
+    if run_data is None:
         raise HTTPException(
             status_code=404,
             detail=f"Run {run_id} not found"
         )
     
-    run_data = runs_store[run_id]
-    
-    return StateResponse(
-        run_id=run_data["run_id"],
-        graph_id=run_data["graph_id"],
-        state=run_data["state"],
-        execution_log=run_data["execution_log"],
-        timestamp=run_data["timestamp"]
-    )
+    return Response(content=run_data["body"], media_type="application/json")
 
 
 @app.get("/graphs")
 async def list_graphs():
-    return {
+    return ORJSONResponse({
         "graphs": [
             {
                 "graph_id": gid,
                 "nodes": list(graph.definition.nodes),
                 "entry_point": graph.definition.entry_point
             }
-            for gid, graph in graphs_store.items()
+            for gid, graph in list(graphs_store.items())
         ]
-    }
+    })
 
 
 @app.get("/runs")
-async def list_runs():
-    return {
-        "runs": [
-            {
-                "run_id": run_data["run_id"],
-                "graph_id": run_data["graph_id"],
-                "timestamp": run_data["timestamp"],
-                "status": run_data["status"]
-            }
-            for run_data in runs_store.values()
-        ]
-    }
+def list_runs():
+    with runs_lock:
+        stored_runs = list(runs_store.values())
+    
+    runs = [
+        {
+            "run_id": run_data["run_id"],
+            "graph_id": run_data["graph_id"],
+            "timestamp": run_data["timestamp"],
+            "status": run_data["status"]
+        }
+        for run_data in stored_runs
+    ]
+    
+    return ORJSONResponse({"runs": runs})
 
 
 @app.websocket("/ws/run/{graph_id}")
@@ -232,24 +325,24 @@ async def websocket_endpoint(websocket: WebSocket, graph_id: str):
     await websocket_manager.connect(websocket, graph_id)
     
     try:
-        while True:
-            try:
-                data = await websocket.receive_text()
-                logger.debug(f"Received WebSocket message: {data}")
-            except WebSocketDisconnect:
-                break
-            except Exception as e:
-                logger.error(f"WebSocket error: {e}")
-                break
-    
-    except WebSocketDisconnect:
-        pass
+        # iter_text stops cleanly when the client disconnects
+        async for data in websocket.iter_text():
+            logger.debug("Received WebSocket message: %s", data)
+    except Exception as e:
+        logger.error("WebSocket error: %s", e)
     finally:
         await websocket_manager.disconnect(websocket, graph_id)
 
 
-@app.post("/run_async", response_model=RunAsyncResponse)
-async def run_async(request: RunAsyncRequest, background_tasks: BackgroundTasks):
+@app.post(
+    "/run_async",
+    response_model=RunAsyncResponse,
+    openapi_extra=json_body_openapi(RunAsyncRequest)
+)
+async def run_async(
+    background_tasks: BackgroundTasks,
+    request: RunAsyncRequest = Depends(json_body(RunAsyncRequest))
+):
     if request.graph_id not in graphs_store:
         raise HTTPException(
             status_code=404,
@@ -257,10 +350,10 @@ async def run_async(request: RunAsyncRequest, background_tasks: BackgroundTasks)
         )
     
     graph = graphs_store[request.graph_id]
-    run_id = str(uuid4())
+    run_id = uuid4().hex
     
-    await job_tracker.create_job(run_id, request.graph_id)
-    initial_state = WorkflowState(**request.input_data)
+    job_tracker.create_job(run_id, request.graph_id)
+    initial_state = request.input_data
     
     background_tasks.add_task(
         execute_workflow_async,
@@ -269,7 +362,7 @@ async def run_async(request: RunAsyncRequest, background_tasks: BackgroundTasks)
         initial_state
     )
     
-    logger.info(f"Started async execution {run_id} for graph {request.graph_id}")
+    logger.info("Started async execution %s for graph %s", run_id, request.graph_id)
     
     return RunAsyncResponse(
         run_id=run_id,
@@ -279,7 +372,7 @@ async def run_async(request: RunAsyncRequest, background_tasks: BackgroundTasks)
 
 @app.get("/run_status/{run_id}", response_model=JobStatusResponse)
 async def get_run_status(run_id: str):
-    job = await job_tracker.get_job(run_id)
+    job = job_tracker.get_job(run_id)
     
     if not job:
         raise HTTPException(
@@ -287,15 +380,4 @@ async def get_run_status(run_id: str):
             detail=f"Run {run_id} not found"
         )
     
-    job_dict = job.to_dict()
-    
-    return JobStatusResponse(
-        run_id=job_dict["run_id"],
-        graph_id=job_dict["graph_id"],
-        status=job_dict["status"],
-        progress_percent=job_dict["progress_percent"],
-        last_node=job_dict["last_node"],
-        error_message=job_dict["error_message"],
-        start_time=job_dict["start_time"],
-        end_time=job_dict["end_time"]
-    )
+    return ORJSONResponse(job.to_dict())
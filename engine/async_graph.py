@@ -2,18 +2,26 @@
 Async workflow graph execution with WebSocket streaming.
 """
 import asyncio
-from typing import Dict, List, Tuple, Any, Optional
-from datetime import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple, Any
 import logging
 import traceback
 
 from engine.state import WorkflowState
-from engine.graph import WorkflowGraph
+from engine.graph import WorkflowGraph, _ExecutionLog
 from engine.websocket_manager import websocket_manager
 from engine.job_tracker import job_tracker
 
 logger = logging.getLogger(__name__)
 
+# Dedicated pool for node functions so they don't compete with the
+# event loop's default executor used by the rest of the app
+_NODE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="node"
+)
+
 
 class AsyncWorkflowGraph:
     """
@@ -35,96 +43,73 @@ class AsyncWorkflowGraph:
             Tuple of (final_state, execution_log)
         """
         graph_id = "async_execution"  # Could be passed as parameter
-        execution_log: List[Dict[str, Any]] = []
+        graph = self.workflow_graph
+        total_nodes = len(graph.definition.nodes)
+        log = _ExecutionLog()
         
         try:
             # Update job status
-            await job_tracker.update_job_progress(run_id, "starting", 0, len(self.workflow_graph.definition.nodes))
+            job_tracker.update_job_progress(run_id, "starting", 0, total_nodes)
             
-            # Execute the workflow with streaming
-            state = initial_state
-            current_node = self.workflow_graph.definition.entry_point
-            iteration_count = 0
-            max_iterations = 1000
+            logger.info("Starting async execution %s", run_id)
             
-            logger.info(f"Starting async execution {run_id} from '{current_node}'")
+            loop = asyncio.get_running_loop()
+            steps = graph._iter_execution(initial_state, log)
+            step = next(steps)
             
-            while current_node is not None and iteration_count < max_iterations:
-                iteration_count += 1
-                start_time = datetime.utcnow()
-                
-                logger.info(f"Executing node: {current_node} (iteration {iteration_count})")
+            while step is not None:
+                current_node, node_func, state = step
                 
                 # Update job progress
-                await job_tracker.update_job_progress(run_id, current_node, iteration_count - 1, len(self.workflow_graph.definition.nodes))
+                job_tracker.update_job_progress(run_id, current_node, len(log.nodes), total_nodes)
                 
                 try:
                     # Execute node (run in thread pool to avoid blocking)
-                    node_func = self.workflow_graph.registry.get_node(current_node)
-                    state = await asyncio.get_event_loop().run_in_executor(None, node_func, state)
+                    state = await loop.run_in_executor(_NODE_EXECUTOR, node_func, state)
                     
                 except Exception as e:
                     error_msg = f"Node '{current_node}' failed: {str(e)}"
                     logger.error(error_msg)
-                    await job_tracker.mark_job_failed(run_id, error_msg)
-                    await websocket_manager.send_error(graph_id, error_msg)
+                    job_tracker.mark_job_failed(run_id, error_msg)
+                    websocket_manager.send_error(graph_id, error_msg)
                     raise RuntimeError(error_msg)
                 
-                end_time = datetime.utcnow()
-                duration_ms = (end_time - start_time).total_seconds() * 1000
-                
-                # Create log entry
-                log_entry = {
-                    "node": current_node,
-                    "timestamp": start_time.isoformat(),
-                    "duration_ms": round(duration_ms, 2),
-                    "iteration": iteration_count
-                }
-                execution_log.append(log_entry)
-                
-                # Stream to WebSocket clients immediately
-                await websocket_manager.send_node_executed(
-                    graph_id=graph_id,
-                    node=current_node,
-                    iteration=iteration_count,
-                    timestamp=start_time.isoformat(),
-                    state_snapshot={
-                        "current_length": getattr(state, 'current_length', 0),
-                        "refinement_iterations": getattr(state, 'refinement_iterations', 0)
-                    }
-                )
-                
-                logger.info(f"Completed node '{current_node}' in {duration_ms:.2f}ms")
-                
-                # Get next node
-                current_node = self.workflow_graph._get_next_node(current_node, state)
+                try:
+                    step = steps.send(state)
+                except StopIteration as done:
+                    step = None
+                    state = done.value
                 
-                # Small delay to allow WebSocket messages to be sent
-                await asyncio.sleep(0.01)
-            
-            if iteration_count >= max_iterations:
-                error_msg = f"Execution exceeded maximum iterations ({max_iterations})"
-                await job_tracker.mark_job_failed(run_id, error_msg)
-                await websocket_manager.send_error(graph_id, error_msg)
-                raise RuntimeError(error_msg)
+                # Queue event for WebSocket clients, if anyone is listening
+                if websocket_manager.has_subscribers(graph_id):
+                    websocket_manager.send_node_executed(
+                        graph_id=graph_id,
+                        node=current_node,
+                        iteration=len(log.nodes),
+                        timestamp=log.timestamp(-1),
+                        state_snapshot={
+                            "current_length": state.current_length,
+                            "refinement_iterations": state.refinement_iterations
+                        }
+                    )
             
             # Mark job as completed
-            await job_tracker.mark_job_completed(run_id)
+            job_tracker.mark_job_completed(run_id)
             
             # Send completion message
-            await websocket_manager.send_completed(graph_id, run_id)
+            websocket_manager.send_completed(graph_id, run_id)
             
-            logger.info(f"Async execution {run_id} completed after {iteration_count} iterations")
+            logger.info("Async execution %s completed after %d iterations", run_id, len(log.nodes))
             
-            return state, execution_log
+            return state, log.entries()
             
         except Exception as e:
             error_msg = f"Async execution failed: {str(e)}"
-            logger.error(f"Async execution {run_id} failed: {error_msg}")
+            logger.error("Async execution %s failed: %s", run_id, error_msg)
             logger.error(traceback.format_exc())
             
-            await job_tracker.mark_job_failed(run_id, error_msg)
-            await websocket_manager.send_error(graph_id, error_msg)
+            job_tracker.mark_job_failed(run_id, error_msg)
+            websocket_manager.send_error(graph_id, error_msg)
             
             raise
 
@@ -144,8 +129,8 @@ async def execute_workflow_async(run_id: str, graph: WorkflowGraph, initial_stat
         final_state, execution_log = await async_graph.execute_async(run_id, initial_state)
         
         # Store results (you might want to store these in a database)
-        logger.info(f"Async workflow {run_id} completed successfully")
+        logger.info("Async workflow %s completed successfully", run_id)
         
     except Exception as e:
-        logger.error(f"Async workflow {run_id} failed: {str(e)}")
+        logger.error("Async workflow %s failed: %s", run_id, e)
         # Error already handled in execute_async
\ No newline at end of file
@@ -1,13 +1,63 @@
-from typing import Dict, List, Tuple, Any, Optional, Callable
+from typing import Dict, List, Tuple, Any, Optional, Callable, Generator
 from pydantic import BaseModel, Field
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import partial
+from time import perf_counter_ns
 
 from engine.state import WorkflowState
 from engine.registry import NodeRegistry
 
 logger = logging.getLogger(__name__)
 
+MAX_ITERATIONS = 1000
+
+# (node_name, node_func, state) handed to the caller for each node to run
+ExecutionStep = Tuple[str, Callable[[WorkflowState], WorkflowState], WorkflowState]
+
+
+class _ExecutionLog:
+    """
+    Execution log of a single run, kept as parallel columns.
+    
+    Wall-clock time is read once per run; node timestamps are derived from
+    perf_counter_ns offsets and only formatted when they are needed.
+    """
+    
+    __slots__ = ("run_start", "run_start_ns", "nodes", "offsets", "durations")
+    
+    def __init__(self):
+        self.run_start = datetime.utcnow()
+        self.run_start_ns = perf_counter_ns()
+        self.nodes: List[str] = []
+        self.offsets: List[int] = []
+        self.durations: List[float] = []
+    
+    def record(self, node: str, start_ns: int, end_ns: int) -> float:
+        """Append a node execution and return its duration in milliseconds."""
+        duration_ms = (end_ns - start_ns) / 1e6
+        self.nodes.append(node)
+        self.offsets.append(start_ns - self.run_start_ns)
+        self.durations.append(duration_ms)
+        return duration_ms
+    
+    def timestamp(self, index: int) -> str:
+        """ISO timestamp of the node execution at the given log position."""
+        offset_us = self.offsets[index] // 1000
+        return (self.run_start + timedelta(microseconds=offset_us)).isoformat()
+    
+    def entries(self) -> List[Dict[str, Any]]:
+        """Zip the columns into the list of log entries returned to callers."""
+        return [
+            {
+                "node": node,
+                "timestamp": self.timestamp(index),
+                "duration_ms": round(duration_ms, 2),
+                "iteration": index + 1
+            }
+            for index, (node, duration_ms) in enumerate(zip(self.nodes, self.durations))
+        ]
+
 
 class GraphDefinition(BaseModel):
     nodes: List[str] = Field(..., description="List of node names")
@@ -15,16 +65,18 @@ class GraphDefinition(BaseModel):
     entry_point: str = Field(..., description="Starting node")
     
     def validate_structure(self) -> None:
-        if self.entry_point not in self.nodes:
+        node_set = set(self.nodes)
+        
+        if self.entry_point not in node_set:
             raise ValueError(f"Entry point '{self.entry_point}' not in nodes list")
         
         for source in self.edges.keys():
-            if source not in self.nodes:
+            if source not in node_set:
                 raise ValueError(f"Edge source '{source}' not in nodes list")
         
         for targets in self.edges.values():
             for target in targets:
-                if target not in self.nodes:
+                if target not in node_set:
                     raise ValueError(f"Edge target '{target}' not in nodes list")
 
 
@@ -38,111 +90,134 @@ class WorkflowGraph:
             if not registry.has_node(node_name):
                 raise ValueError(f"Node '{node_name}' not found in registry")
         
-        logger.info(f"Initialized WorkflowGraph with {len(definition.nodes)} nodes")
+        # Flatten the definition into index-based tables for the execution loop
+        self._name_to_idx: Dict[str, int] = {
+            name: idx for idx, name in enumerate(definition.nodes)
+        }
+        self._node_funcs: List[Callable[[WorkflowState], WorkflowState]] = [
+            registry.get_node(name) for name in definition.nodes
+        ]
+        self._edges_idx: List[List[int]] = [
+            [self._name_to_idx[target] for target in definition.edges.get(name, [])]
+            for name in definition.nodes
+        ]
+        self._entry_idx = self._name_to_idx[definition.entry_point]
+        self._loop_check_idx = self._name_to_idx.get("check_length_loop", -1)
+        self._refine_idx = self._name_to_idx.get("refine_summary", -1)
+        # Routing is fixed by the definition, so each node gets its own router
+        self._next_fn: List[Callable[[WorkflowState], Optional[int]]] = [
+            self._build_router(idx) for idx in range(len(definition.nodes))
+        ]
+        
+        logger.info("Initialized WorkflowGraph with %d nodes", len(definition.nodes))
     
     def execute(
         self,
         initial_state: WorkflowState
     ) -> Tuple[WorkflowState, List[Dict[str, Any]]]:
+        log = _ExecutionLog()
+        steps = self._iter_execution(initial_state, log)
+        
+        try:
+            node_name, node_func, state = next(steps)
+            while True:
+                try:
+                    state = node_func(state)
+                except Exception as e:
+                    logger.error("Node '%s' execution failed: %s", node_name, e)
+                    raise RuntimeError(f"Node '{node_name}' failed: {str(e)}")
+                
+                node_name, node_func, state = steps.send(state)
+        except StopIteration as done:
+            return done.value, log.entries()
+    
+    def _iter_execution(
+        self,
+        initial_state: WorkflowState,
+        log: _ExecutionLog
+    ) -> Generator[ExecutionStep, WorkflowState, WorkflowState]:
+        """
+        Drive a run one node at a time; shared by the sync and async executors.
+        
+        Yields (node_name, node_func, state) for every node to run. The caller
+        runs node_func in its own way and sends back the resulting state.
+        Timing, logging, the iteration limit and routing all live here, so
+        both executors behave the same.
+        
+        Returns:
+            Final state once a router ends the run
+        """
+        nodes = self.definition.nodes
+        node_funcs = self._node_funcs
+        next_fn = self._next_fn
         state = initial_state
-        execution_log: List[Dict[str, Any]] = []
-        current_node = self.definition.entry_point
-        visited_sequence: List[str] = []
-        max_iterations = 1000
+        current_idx: Optional[int] = self._entry_idx
         iteration_count = 0
         
-        logger.info(f"Starting graph execution from '{current_node}'")
+        logger.info("Starting graph execution from '%s'", nodes[current_idx])
         
-        while current_node is not None:
+        while current_idx is not None:
             iteration_count += 1
             
-            if iteration_count > max_iterations:
+            if iteration_count > MAX_ITERATIONS:
                 raise RuntimeError(
-                    f"Execution exceeded maximum iterations ({max_iterations}). "
+                    f"Execution exceeded maximum iterations ({MAX_ITERATIONS}). "
                     f"Possible infinite loop detected."
                 )
             
-            start_time = datetime.utcnow()
-            logger.info(f"Executing node: {current_node} (iteration {iteration_count})")
-            
-            try:
-                node_func = self.registry.get_node(current_node)
-                state = node_func(state)
-                
-            except Exception as e:
-                logger.error(f"Node '{current_node}' execution failed: {str(e)}")
-                raise RuntimeError(f"Node '{current_node}' failed: {str(e)}")
+            current_node = nodes[current_idx]
+            logger.info("Executing node: %s (iteration %d)", current_node, iteration_count)
             
-            end_time = datetime.utcnow()
-            duration_ms = (end_time - start_time).total_seconds() * 1000
+            start_ns = perf_counter_ns()
+            state = yield current_node, node_funcs[current_idx], state
+            duration_ms = log.record(current_node, start_ns, perf_counter_ns())
             
-            log_entry = {
-                "node": current_node,
-                "timestamp": start_time.isoformat(),
-                "duration_ms": round(duration_ms, 2),
-                "iteration": iteration_count
-            }
-            execution_log.append(log_entry)
-            visited_sequence.append(current_node)
+            logger.info("Completed node '%s' in %.2fms", current_node, duration_ms)
             
+            current_idx = next_fn[current_idx](state)
+        
+        if logger.isEnabledFor(logging.INFO):
             logger.info(
-                f"Completed node '{current_node}' in {duration_ms:.2f}ms"
+                "Graph execution completed after %d iterations. Path: %s",
+                iteration_count, " -> ".join(log.nodes)
             )
-            
-            current_node = self._get_next_node(current_node, state)
-        
-        logger.info(
-            f"Graph execution completed after {iteration_count} iterations. "
-            f"Path: {' -> '.join(visited_sequence)}"
-        )
         
-        return state, execution_log
+        return state
     
-    def _get_next_node(
-        self,
-        current_node: str,
-        state: WorkflowState
-    ) -> Optional[str]:
-        if current_node not in self.definition.edges:
-            logger.info(f"Node '{current_node}' has no outgoing edges. Workflow complete.")
-            return None
-        
-        next_nodes = self.definition.edges[current_node]
+    def _build_router(self, idx: int) -> Callable[[WorkflowState], Optional[int]]:
+        next_indices = self._edges_idx[idx]
+        node_name = self.definition.nodes[idx]
         
-        if not next_nodes:
-            logger.info(f"Node '{current_node}' has empty edge list. Workflow complete.")
-            return None
+        if not next_indices:
+            def route_terminal(state: WorkflowState) -> Optional[int]:
+                logger.info("Node '%s' has no outgoing edges. Workflow complete.", node_name)
+                return None
+            
+            return route_terminal
         
-        if current_node == "check_length_loop":
-            return self._handle_loop_condition(next_nodes, state)
+        if idx == self._loop_check_idx:
+            loop_idx = self._refine_idx if self._refine_idx in next_indices else None
+            return partial(self._handle_loop_condition, loop_idx)
         
-        next_node = next_nodes[0]
-        logger.debug(f"Next node: {next_node}")
-        return next_node
+        next_idx = next_indices[0]
+        return lambda state: next_idx
     
     def _handle_loop_condition(
         self,
-        next_nodes: List[str],
+        loop_idx: Optional[int],
         state: WorkflowState
-    ) -> Optional[str]:
-        should_loop = (
-            state.current_length > state.max_length and
-            state.refinement_iterations < state.max_refinement_iterations
-        )
-        
-        if should_loop:
-            if "refine_summary" in next_nodes:
-                logger.info(
-                    f"Loop condition met: length={state.current_length} > "
-                    f"max={state.max_length}, iteration={state.refinement_iterations}. "
-                    f"Looping to refine_summary."
-                )
-                return "refine_summary"
+    ) -> Optional[int]:
+        if state.needs_refinement() and loop_idx is not None:
+            logger.info(
+                "Loop condition met: length=%d > max=%d, iteration=%d. "
+                "Looping to refine_summary.",
+                state.current_length, state.max_length, state.refinement_iterations
+            )
+            return loop_idx
         
         logger.info(
-            f"Loop condition not met: length={state.current_length}, "
-            f"max={state.max_length}, iterations={state.refinement_iterations}. "
-            f"Exiting loop."
+            "Loop condition not met: length=%d, max=%d, iterations=%d. Exiting loop.",
+            state.current_length, state.max_length, state.refinement_iterations
         )
         
         return None
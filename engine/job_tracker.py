@@ -1,7 +1,6 @@
 """
 Job tracker for async workflow execution with status monitoring.
 """
-import asyncio
 from typing import Dict, Optional
 from datetime import datetime
 from enum import Enum
@@ -32,6 +31,12 @@ class JobInfo:
         self.end_time = None
         self.total_nodes = 0
         self.completed_nodes = 0
+        # Immutable fields are formatted once and reused by every status poll
+        self._base_dict = {
+            "run_id": run_id,
+            "graph_id": graph_id,
+            "start_time": self.start_time.isoformat()
+        }
     
     def update_progress(self, node: str, completed_nodes: int, total_nodes: int):
         """Update job progress."""
@@ -56,13 +61,11 @@ class JobInfo:
     def to_dict(self) -> dict:
         """Convert to dictionary for API response."""
         return {
-            "run_id": self.run_id,
-            "graph_id": self.graph_id,
+            **self._base_dict,
             "status": self.status.value,
             "progress_percent": self.progress_percent,
             "last_node": self.last_node,
             "error_message": self.error_message,
-            "start_time": self.start_time.isoformat(),
             "end_time": self.end_time.isoformat() if self.end_time else None
         }
 
@@ -73,10 +76,10 @@ class JobTracker:
     """
     
     def __init__(self):
+        # Single-key dict operations are atomic, so no lock is needed
         self.jobs: Dict[str, JobInfo] = {}
-        self.lock = asyncio.Lock()
     
-    async def create_job(self, run_id: str, graph_id: str) -> JobInfo:
+    def create_job(self, run_id: str, graph_id: str) -> JobInfo:
         """
         Create a new job entry.
         
@@ -87,13 +90,12 @@ class JobTracker:
         Returns:
             JobInfo instance
         """
-        async with self.lock:
-            job = JobInfo(run_id, graph_id)
-            self.jobs[run_id] = job
-            logger.info(f"Created job {run_id} for graph {graph_id}")
-            return job
+        job = JobInfo(run_id, graph_id)
+        self.jobs[run_id] = job
+        logger.info("Created job %s for graph %s", run_id, graph_id)
+        return job
     
-    async def get_job(self, run_id: str) -> Optional[JobInfo]:
+    def get_job(self, run_id: str) -> Optional[JobInfo]:
         """
         Get job information.
         
@@ -103,10 +105,9 @@ class JobTracker:
         Returns:
             JobInfo if found, None otherwise
         """
-        async with self.lock:
-            return self.jobs.get(run_id)
+        return self.jobs.get(run_id)
     
-    async def update_job_progress(self, run_id: str, node: str, completed_nodes: int, total_nodes: int):
+    def update_job_progress(self, run_id: str, node: str, completed_nodes: int, total_nodes: int):
         """
         Update job progress.
         
@@ -116,24 +117,24 @@ class JobTracker:
             completed_nodes: Number of completed nodes
             total_nodes: Total number of nodes
         """
-        async with self.lock:
-            if run_id in self.jobs:
-                self.jobs[run_id].update_progress(node, completed_nodes, total_nodes)
-                logger.debug(f"Job {run_id} progress: {completed_nodes}/{total_nodes} nodes")
+        job = self.jobs.get(run_id)
+        if job:
+            job.update_progress(node, completed_nodes, total_nodes)
+            logger.debug("Job %s progress: %d/%d nodes", run_id, completed_nodes, total_nodes)
     
-    async def mark_job_completed(self, run_id: str):
+    def mark_job_completed(self, run_id: str):
         """
         Mark job as completed.
         
         Args:
             run_id: Run ID
         """
-        async with self.lock:
-            if run_id in self.jobs:
-                self.jobs[run_id].mark_completed()
-                logger.info(f"Job {run_id} completed")
+        job = self.jobs.get(run_id)
+        if job:
+            job.mark_completed()
+            logger.info("Job %s completed", run_id)
     
-    async def mark_job_failed(self, run_id: str, error_message: str):
+    def mark_job_failed(self, run_id: str, error_message: str):
         """
         Mark job as failed.
         
@@ -141,12 +142,12 @@ class JobTracker:
             run_id: Run ID
             error_message: Error message
         """
-        async with self.lock:
-            if run_id in self.jobs:
-                self.jobs[run_id].mark_failed(error_message)
-                logger.error(f"Job {run_id} failed: {error_message}")
+        job = self.jobs.get(run_id)
+        if job:
+            job.mark_failed(error_message)
+            logger.error("Job %s failed: %s", run_id, error_message)
     
-    async def cleanup_old_jobs(self, max_age_hours: int = 24):
+    def cleanup_old_jobs(self, max_age_hours: int = 24):
         """
         Clean up old completed/failed jobs.
         
@@ -155,15 +156,15 @@ class JobTracker:
         """
         cutoff_time = datetime.utcnow().timestamp() - (max_age_hours * 3600)
         
-        async with self.lock:
-            to_remove = []
-            for run_id, job in self.jobs.items():
-                if job.end_time and job.end_time.timestamp() < cutoff_time:
-                    to_remove.append(run_id)
-            
-            for run_id in to_remove:
-                del self.jobs[run_id]
-                logger.info(f"Cleaned up old job {run_id}")
+        # Iterate over a snapshot so jobs created meanwhile don't break iteration
+        to_remove = []
+        for run_id, job in list(self.jobs.items()):
+            if job.end_time and job.end_time.timestamp() < cutoff_time:
+                to_remove.append(run_id)
+        
+        for run_id in to_remove:
+            self.jobs.pop(run_id, None)
+            logger.info("Cleaned up old job %s", run_id)
 
 
 # Global job tracker instance
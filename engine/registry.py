@@ -44,7 +44,7 @@ class NodeRegistry:
             raise ValueError(f"Node '{name}' is already registered")
         
         self._nodes[name] = func
-        logger.info(f"Registered node: {name}")
+        logger.info("Registered node: %s", name)
     
     def get_node(self, name: str) -> Callable[[WorkflowState], WorkflowState]:
         """
@@ -59,10 +59,10 @@ class NodeRegistry:
         Raises:
             KeyError: If node not found
         """
-        if name not in self._nodes:
-            raise KeyError(f"Node '{name}' not found in registry")
-        
-        return self._nodes[name]
+        try:
+            return self._nodes[name]
+        except KeyError:
+            raise KeyError(f"Node '{name}' not found in registry") from None
     
     def register_tool(self, name: str, tool: Any) -> None:
         """
@@ -79,7 +79,7 @@ class NodeRegistry:
             raise ValueError(f"Tool '{name}' is already registered")
         
         self._tools[name] = tool
-        logger.info(f"Registered tool: {name}")
+        logger.info("Registered tool: %s", name)
     
     def get_tool(self, name: str) -> Any:
         """
@@ -94,10 +94,10 @@ class NodeRegistry:
         Raises:
             KeyError: If tool not found
         """
-        if name not in self._tools:
-            raise KeyError(f"Tool '{name}' not found in registry")
-        
-        return self._tools[name]
+        try:
+            return self._tools[name]
+        except KeyError:
+            raise KeyError(f"Tool '{name}' not found in registry") from None
     
     def list_nodes(self) -> List[str]:
         """
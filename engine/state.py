@@ -2,7 +2,7 @@
 Workflow state management using Pydantic models.
 Defines the state structure that flows through the workflow graph.
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Any, Dict
 
 
@@ -36,33 +36,32 @@ class WorkflowState(BaseModel):
         description="Additional metadata collected during execution"
     )
     
-    class Config:
-        """Pydantic configuration."""
-        json_schema_extra = {
-            "example": {
-                "text": "This is a long document that needs to be summarized...",
-                "max_length": 100,
-                "chunk_size": 50,
-                "chunks": [],
-                "chunk_summaries": [],
-                "merged_summary": "",
-                "refined_summary": "",
-                "current_length": 0,
-                "refinement_iterations": 0,
-                "max_refinement_iterations": 5
-            }
-        }
+    model_config = ConfigDict(validate_assignment=False, extra="ignore")
     
     def copy_with_updates(self, **updates) -> "WorkflowState":
         """
         Create a new state instance with specified field updates.
         
+        The state was validated when it entered the engine and updates come
+        from node code, so the copy is made without dumping the model or
+        re-running validation. Unchanged fields are shared with this state.
+        
         Args:
             **updates: Fields to update in the new state
             
         Returns:
             New WorkflowState instance with updates applied
         """
-        current_data = self.model_dump()
-        current_data.update(updates)
-        return WorkflowState(**current_data)
+        return self.model_copy(update=updates)
+    
+    def needs_refinement(self) -> bool:
+        """
+        Check whether the summary is still too long and may be refined again.
+        
+        Returns:
+            True if another refinement iteration should run, False otherwise
+        """
+        return (
+            self.current_length > self.max_length and
+            self.refinement_iterations < self.max_refinement_iterations
+        )
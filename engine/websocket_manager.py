@@ -1,24 +1,45 @@
 """
 WebSocket manager for live log streaming during workflow execution.
 """
-import json
 import asyncio
-from typing import Dict, Set
+from typing import Dict, List, Set
 from fastapi import WebSocket
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of messages coalesced into a single frame
+MAX_BATCH_SIZE = 50
+
+# How long messages for a graph are held back to be sent as one frame
+COALESCE_WINDOW_SECONDS = 0.002
+
+# Maximum number of unsent frames per client before it is dropped
+MAX_QUEUE_SIZE = 64
+
 
 class WebSocketManager:
     """
     Manages WebSocket connections for live workflow log streaming.
+    
+    Messages for a graph are collected for a short window and serialized
+    into one frame. Every connection has a bounded frame queue drained by
+    its own writer task, so callers never wait on client sends and a slow
+    client cannot hold up the others.
     """
     
     def __init__(self):
-        # Active connections per graph_id
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
-        self.connection_lock = asyncio.Lock()
+        # Pending frame queue per connection, grouped by graph_id
+        # Mutated only between awaits, so no lock is needed on the event loop
+        self.active_connections: Dict[str, Dict[WebSocket, asyncio.Queue]] = {}
+        # Writer task per connection
+        self._writers: Dict[WebSocket, asyncio.Task] = {}
+        # Close tasks for dropped clients, kept until they finish
+        self._closing: Set[asyncio.Task] = set()
+        # Serialized messages waiting for the coalescing window, per graph_id
+        self._pending: Dict[str, List[bytes]] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
     
     async def connect(self, websocket: WebSocket, graph_id: str):
         """
@@ -30,12 +51,13 @@ class WebSocketManager:
         """
         await websocket.accept()
         
-        async with self.connection_lock:
-            if graph_id not in self.active_connections:
-                self.active_connections[graph_id] = set()
-            self.active_connections[graph_id].add(websocket)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_QUEUE_SIZE)
+        self.active_connections.setdefault(graph_id, {})[websocket] = queue
+        self._writers[websocket] = asyncio.create_task(
+            self._writer(graph_id, websocket, queue)
+        )
         
-        logger.info(f"WebSocket connected for graph {graph_id}")
+        logger.info("WebSocket connected for graph %s", graph_id)
     
     async def disconnect(self, websocket: WebSocket, graph_id: str):
         """
@@ -45,45 +67,143 @@ class WebSocketManager:
             websocket: WebSocket connection
             graph_id: Graph ID to unsubscribe from
         """
-        async with self.connection_lock:
-            if graph_id in self.active_connections:
-                self.active_connections[graph_id].discard(websocket)
-                if not self.active_connections[graph_id]:
-                    del self.active_connections[graph_id]
+        self._remove_connection(graph_id, websocket)
+        
+        logger.info("WebSocket disconnected for graph %s", graph_id)
+    
+    def _remove_connection(self, graph_id: str, websocket: WebSocket):
+        """
+        Drop a connection and cancel its writer task.
+        
+        Args:
+            graph_id: Graph ID the connection is subscribed to
+            websocket: WebSocket connection to remove
+        """
+        connections = self.active_connections.get(graph_id)
+        if connections is None or connections.pop(websocket, None) is None:
+            return
+        if not connections:
+            del self.active_connections[graph_id]
+            self._pending.pop(graph_id, None)
+            handle = self._flush_handles.pop(graph_id, None)
+            if handle is not None:
+                handle.cancel()
+        
+        writer = self._writers.pop(websocket, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+    
+    async def _writer(self, graph_id: str, websocket: WebSocket, queue: asyncio.Queue):
+        """
+        Send queued frames to a single connection.
+        
+        Args:
+            graph_id: Graph ID the connection is subscribed to
+            websocket: WebSocket connection to send to
+            queue: Queue of pending frames
+        """
+        while True:
+            frame = await queue.get()
+            try:
+                await websocket.send_text(frame)
+            except Exception as e:
+                logger.warning("Failed to send WebSocket message: %s", e)
+                self._remove_connection(graph_id, websocket)
+                return
+    
+    async def _close_slow_client(self, websocket: WebSocket):
+        """
+        Close a connection that fell too far behind.
         
-        logger.info(f"WebSocket disconnected for graph {graph_id}")
+        Args:
+            websocket: WebSocket connection to close
+        """
+        try:
+            await websocket.close(code=1013)
+        except Exception as e:
+            logger.debug("Failed to close slow WebSocket client: %s", e)
     
-    async def broadcast_to_graph(self, graph_id: str, message: dict):
+    def has_subscribers(self, graph_id: str) -> bool:
         """
-        Broadcast message to all WebSocket connections for a specific graph.
+        Check whether any WebSocket client is subscribed to a graph.
+        
+        Args:
+            graph_id: Graph ID to check
+            
+        Returns:
+            True if at least one connection is active, False otherwise
+        """
+        return graph_id in self.active_connections
+    
+    def broadcast_to_graph(self, graph_id: str, message: dict):
+        """
+        Queue a message for all WebSocket connections of a specific graph.
         
         Args:
             graph_id: Graph ID to broadcast to
             message: Message dictionary to send
         """
-        if graph_id not in self.active_connections:
+        if graph_id in self.active_connections:
+            self._enqueue(graph_id, orjson.dumps(message))
+    
+    def _enqueue(self, graph_id: str, payload: bytes):
+        """
+        Hold a serialized message until the graph's next frame is flushed.
+        
+        The frame is flushed after COALESCE_WINDOW_SECONDS, or right away
+        once MAX_BATCH_SIZE messages are pending.
+        
+        Args:
+            graph_id: Graph ID to send to
+            payload: Serialized message
+        """
+        pending = self._pending.setdefault(graph_id, [])
+        pending.append(payload)
+        
+        if len(pending) >= MAX_BATCH_SIZE:
+            handle = self._flush_handles.pop(graph_id, None)
+            if handle is not None:
+                handle.cancel()
+            self._flush(graph_id)
+        elif graph_id not in self._flush_handles:
+            self._flush_handles[graph_id] = asyncio.get_running_loop().call_later(
+                COALESCE_WINDOW_SECONDS, self._flush, graph_id
+            )
+    
+    def _flush(self, graph_id: str):
+        """
+        Put the pending messages of a graph on every connection queue.
+        
+        A single message is sent as an object, several as one JSON array.
+        Connections whose queue is full are dropped and closed.
+        
+        Args:
+            graph_id: Graph ID to flush
+        """
+        self._flush_handles.pop(graph_id, None)
+        messages = self._pending.pop(graph_id, None)
+        if not messages:
             return
         
-        message_json = json.dumps(message)
-        disconnected = set()
+        frame = messages[0] if len(messages) == 1 else b"[" + b",".join(messages) + b"]"
+        text = frame.decode()
         
-        # Send to all active connections for this graph
-        for websocket in self.active_connections[graph_id].copy():
+        slow = []
+        for websocket, queue in self.active_connections.get(graph_id, {}).items():
             try:
-                await websocket.send_text(message_json)
-            except Exception as e:
-                logger.warning(f"Failed to send WebSocket message: {e}")
-                disconnected.add(websocket)
-        
-        # Clean up disconnected websockets
-        if disconnected:
-            async with self.connection_lock:
-                self.active_connections[graph_id] -= disconnected
-                if not self.active_connections[graph_id]:
-                    del self.active_connections[graph_id]
+                queue.put_nowait(text)
+            except asyncio.QueueFull:
+                slow.append(websocket)
+        
+        for websocket in slow:
+            logger.warning("Dropping slow WebSocket client for graph %s", graph_id)
+            self._remove_connection(graph_id, websocket)
+            task = asyncio.create_task(self._close_slow_client(websocket))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
     
-    async def send_node_executed(self, graph_id: str, node: str, iteration: int, 
-                                timestamp: str, state_snapshot: dict = None):
+    def send_node_executed(self, graph_id: str, node: str, iteration: int, 
+                          timestamp: str, state_snapshot: dict = None):
         """
         Send NODE_EXECUTED event to WebSocket clients.
         
@@ -94,6 +214,9 @@ class WebSocketManager:
             timestamp: ISO timestamp
             state_snapshot: Optional state snapshot
         """
+        if graph_id not in self.active_connections:
+            return
+        
         message = {
             "event": "NODE_EXECUTED",
             "node": node,
@@ -104,9 +227,9 @@ class WebSocketManager:
         if state_snapshot:
             message["state_snapshot"] = state_snapshot
         
-        await self.broadcast_to_graph(graph_id, message)
+        self._enqueue(graph_id, orjson.dumps(message))
     
-    async def send_completed(self, graph_id: str, run_id: str):
+    def send_completed(self, graph_id: str, run_id: str):
         """
         Send COMPLETED event to WebSocket clients.
         
@@ -120,9 +243,9 @@ class WebSocketManager:
             "graph_id": graph_id
         }
         
-        await self.broadcast_to_graph(graph_id, message)
+        self.broadcast_to_graph(graph_id, message)
     
-    async def send_error(self, graph_id: str, error_message: str):
+    def send_error(self, graph_id: str, error_message: str):
         """
         Send ERROR event to WebSocket clients.
         
@@ -135,7 +258,7 @@ class WebSocketManager:
             "message": error_message
         }
         
-        await self.broadcast_to_graph(graph_id, message)
+        self.broadcast_to_graph(graph_id, message)
 
 
 # Global WebSocket manager instance
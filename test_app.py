@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient
+
+from app.main import app, graphs_store
+from engine.registry import NodeRegistry
+from workflows.summarization.graph_def import create_summarization_graph
+
+# Startup events are not run, so only graphs a test registers itself exist;
+# validation happens before any graph lookup
+client = TestClient(app)
+
+JSON_ENDPOINTS = ["/graph/run", "/run_async"]
+
+
+def _post_raw(path, body):
+    return client.post(path, content=body, headers={"content-type": "application/json"})
+
+
+def test_malformed_json_returns_422():
+    for path in JSON_ENDPOINTS:
+        response = _post_raw(path, "{not json")
+        assert response.status_code == 422, path
+        detail = response.json()["detail"]
+        assert detail[0]["type"] == "json_invalid"
+        assert detail[0]["loc"][0] == "body"
+
+
+def test_missing_graph_id_returns_422():
+    for path in JSON_ENDPOINTS:
+        response = _post_raw(path, '{"input_data": {"text": "Some text."}}')
+        assert response.status_code == 422, path
+        detail = response.json()["detail"]
+        assert [error["loc"] for error in detail] == [["body", "graph_id"]]
+        assert detail[0]["type"] == "missing"
+
+
+def test_invalid_input_data_field_returns_422():
+    for path in JSON_ENDPOINTS:
+        response = _post_raw(path, '{"graph_id": "g", "input_data": {"max_length": "abc"}}')
+        assert response.status_code == 422, path
+        detail = response.json()["detail"]
+        assert [error["loc"] for error in detail] == [["body", "input_data", "max_length"]]
+        assert detail[0]["type"] == "int_parsing"
+
+
+def test_run_with_big_integer_metadata():
+    graph_id = "test-big-integer-metadata"
+    graphs_store[graph_id] = create_summarization_graph(NodeRegistry())
+    big = 100000000000000000000000
+    
+    try:
+        response = client.post("/graph/run", json={
+            "graph_id": graph_id,
+            "input_data": {
+                "text": "Machine learning enables computers to learn from data. "
+                        "Deep learning uses neural networks for pattern recognition.",
+                "execution_metadata": {"big": big}
+            }
+        })
+        assert response.status_code == 200, response.text
+        result = response.json()
+        assert result["final_state"]["execution_metadata"]["big"] == big
+        assert result["final_state"]["refined_summary"]
+        
+        response = client.get(f"/graph/state/{result['run_id']}")
+        assert response.status_code == 200, response.text
+        stored = response.json()
+        assert stored["state"] == result["final_state"]
+        assert stored["execution_log"] == result["execution_log"]
+    finally:
+        graphs_store.pop(graph_id, None)
+
+
+def test_openapi_refs_resolve():
+    spec = client.get("/openapi.json").json()
+    schemas = spec["components"]["schemas"]
+
+    def refs(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == "$ref":
+                    yield value
+                else:
+                    yield from refs(value)
+        elif isinstance(node, list):
+            for item in node:
+                yield from refs(item)
+
+    prefix = "#/components/schemas/"
+    for ref in refs(spec):
+        assert ref.startswith(prefix), ref
+        assert ref[len(prefix):] in schemas, f"Unresolved $ref {ref}"
+
+
+if __name__ == "__main__":
+    try:
+        test_malformed_json_returns_422()
+        test_missing_graph_id_returns_422()
+        test_invalid_input_data_field_returns_422()
+        test_run_with_big_integer_metadata()
+        test_openapi_refs_resolve()
+        print("\n🎉 All tests passed!")
+    except Exception as e:
+        print(f"❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+import sys
+import os
+import json
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from engine.websocket_manager import (
+    WebSocketManager, MAX_BATCH_SIZE, MAX_QUEUE_SIZE, COALESCE_WINDOW_SECONDS
+)
+
+
+class FakeWebSocket:
+    def __init__(self, fail=False, block=False):
+        self.frames = []
+        self.fail = fail
+        self.block = block
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        if self.fail:
+            raise RuntimeError("connection lost")
+        if self.block:
+            await asyncio.Event().wait()
+        self.frames.append(json.loads(data))
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+async def _wait_for_flush():
+    await asyncio.sleep(COALESCE_WINDOW_SECONDS * 10)
+
+
+def test_events_in_window_share_one_array_frame():
+    async def run():
+        manager = WebSocketManager()
+        client = FakeWebSocket()
+        await manager.connect(client, "g")
+
+        for i in range(3):
+            manager.send_node_executed("g", "refine_summary", i + 1, "ts")
+        await _wait_for_flush()
+
+        assert len(client.frames) == 1, "Events in one window should share a frame"
+        assert [event["iteration"] for event in client.frames[0]] == [1, 2, 3]
+        await manager.disconnect(client, "g")
+
+    asyncio.run(run())
+
+
+def test_lone_event_is_sent_as_object():
+    async def run():
+        manager = WebSocketManager()
+        client = FakeWebSocket()
+        await manager.connect(client, "g")
+
+        manager.send_completed("g", "run-1")
+        await _wait_for_flush()
+
+        assert client.frames == [{"event": "COMPLETED", "run_id": "run-1", "graph_id": "g"}]
+        await manager.disconnect(client, "g")
+
+    asyncio.run(run())
+
+
+def test_full_batch_is_flushed_without_waiting():
+    async def run():
+        manager = WebSocketManager()
+        client = FakeWebSocket()
+        await manager.connect(client, "g")
+
+        for i in range(MAX_BATCH_SIZE):
+            manager.send_node_executed("g", "split_text", i + 1, "ts")
+        assert "g" not in manager._flush_handles, "A full batch should not wait for the timer"
+        await asyncio.sleep(0)
+
+        assert len(client.frames) == 1
+        assert len(client.frames[0]) == MAX_BATCH_SIZE
+        await manager.disconnect(client, "g")
+
+    asyncio.run(run())
+
+
+def test_failed_send_removes_client():
+    async def run():
+        manager = WebSocketManager()
+        good, bad = FakeWebSocket(), FakeWebSocket(fail=True)
+        await manager.connect(good, "g")
+        await manager.connect(bad, "g")
+
+        manager.send_completed("g", "run-1")
+        await _wait_for_flush()
+
+        assert list(manager.active_connections["g"]) == [good]
+        assert bad not in manager._writers
+        assert len(good.frames) == 1
+        await manager.disconnect(good, "g")
+
+    asyncio.run(run())
+
+
+def test_slow_client_is_dropped_and_closed():
+    async def run():
+        manager = WebSocketManager()
+        fast, slow = FakeWebSocket(), FakeWebSocket(block=True)
+        await manager.connect(fast, "g")
+        await manager.connect(slow, "g")
+
+        # Every full batch is flushed as one frame right away
+        for _ in range(MAX_QUEUE_SIZE + 2):
+            for i in range(MAX_BATCH_SIZE):
+                manager.send_node_executed("g", "split_text", i + 1, "ts")
+            await asyncio.sleep(0)
+        await _wait_for_flush()
+
+        assert list(manager.active_connections["g"]) == [fast]
+        assert slow not in manager._writers
+        assert slow.close_code == 1013
+        assert len(fast.frames) == MAX_QUEUE_SIZE + 2
+        await manager.disconnect(fast, "g")
+
+    asyncio.run(run())
+
+
+def test_disconnect_last_client_clears_graph_state():
+    async def run():
+        manager = WebSocketManager()
+        client = FakeWebSocket()
+        await manager.connect(client, "g")
+
+        manager.send_completed("g", "run-1")
+        assert "g" in manager._pending and "g" in manager._flush_handles
+
+        await manager.disconnect(client, "g")
+
+        assert manager.active_connections == {}
+        assert manager._writers == {}
+        assert manager._pending == {}
+        assert manager._flush_handles == {}
+        assert not manager.has_subscribers("g")
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    try:
+        test_events_in_window_share_one_array_frame()
+        test_lone_event_is_sent_as_object()
+        test_full_batch_is_flushed_without_waiting()
+        test_failed_send_removes_client()
+        test_slow_client_is_dropped_and_closed()
+        test_disconnect_last_client_clears_graph_state()
+        print("\n🎉 All tests passed!")
+    except Exception as e:
+        print(f"❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -7,7 +7,8 @@ from engine.state import WorkflowState
 from engine.registry import NodeRegistry
 from workflows.summarization.graph_def import create_summarization_graph
 from workflows.summarization.nodes_upgraded import (
-    split_text, summarize_chunks, merge_summaries, refine_summary
+    split_text, summarize_chunks, merge_summaries, refine_summary,
+    _refine_text_cached, _REFINE_CACHE_MAX_CHARS
 )
 
 
@@ -61,10 +62,30 @@ def test_individual_nodes():
     print("✅ All node tests passed!")
 
 
+def test_refine_cache_skips_long_inputs():
+    print("\nTesting Refinement Cache Bound...")
+    
+    _refine_text_cached.cache_clear()
+    sentence = "Machine learning enables computers to learn from data. "
+    
+    short_state = WorkflowState(merged_summary=sentence * 2, max_length=50)
+    refine_summary(short_state)
+    refine_summary(short_state)
+    assert _refine_text_cached.cache_info().hits == 1, "Short inputs should be cached"
+    
+    long_text = sentence * (_REFINE_CACHE_MAX_CHARS // len(sentence) + 1)
+    result = refine_summary(WorkflowState(text=long_text, max_length=50))
+    assert result.refined_summary, "Long inputs should still be refined"
+    assert _refine_text_cached.cache_info().currsize == 1, "Long inputs should not be cached"
+    
+    print("✅ Refinement cache test passed!")
+
+
 if __name__ == "__main__":
     try:
         test_workflow_engine()
         test_individual_nodes()
+        test_refine_cache_skips_long_inputs()
         print("\n🎉 All tests passed!")
     except Exception as e:
         print(f"❌ Test failed: {e}")
@@ -1,14 +1,41 @@
 import re
 import heapq
 import math
-from typing import List, Dict
+from typing import List, Dict, Tuple
+from bisect import bisect_right
 from collections import Counter
+from functools import lru_cache
+from itertools import accumulate, chain
 import logging
 
 from engine.state import WorkflowState
 
 logger = logging.getLogger(__name__)
 
+_SENT_SPLIT_RE = re.compile(r'[.!?]+')
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+
+# Below this many words a plain dict loop counts faster than Counter
+_COUNTER_MIN_WORDS = 100
+
+# Longer refinement inputs bypass the cache so it cannot pin whole documents
+_REFINE_CACHE_MAX_CHARS = 4096
+
+_STOPWORDS: frozenset = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
+    'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
+    'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'what',
+    'which', 'who', 'when', 'where', 'why', 'how', 'all', 'each', 'every',
+    'both', 'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor',
+    'not', 'only', 'own', 'same', 'so', 'than', 'too', 'very', 'just',
+    'also', 'into', 'through', 'during', 'before', 'after', 'above', 'below',
+    'between', 'under', 'again', 'further', 'then', 'once', 'here', 'there',
+    'any', 'their', 'them', 'about', 'against', 'because', 'being', 'down',
+    'off', 'over', 'up', 'out', 'until', 'while', 'your'
+})
+
 
 def split_text(state: WorkflowState) -> WorkflowState:
     text = state.text.strip()
@@ -19,32 +46,26 @@ def split_text(state: WorkflowState) -> WorkflowState:
         return state.copy_with_updates(chunks=[])
     
     words = text.split()
+    # Running length of each word plus its trailing space; a chunk ends at
+    # the last word whose running length still fits within chunk_size.
+    ends = list(accumulate(len(word) + 1 for word in words))
     chunks: List[str] = []
-    current_chunk: List[str] = []
-    current_length = 0
-    
-    for word in words:
-        word_length = len(word) + 1
-        
-        if current_length + word_length > chunk_size and current_chunk:
-            chunks.append(" ".join(current_chunk))
-            current_chunk = [word]
-            current_length = word_length
-        else:
-            current_chunk.append(word)
-            current_length += word_length
-    
-    if current_chunk:
-        chunks.append(" ".join(current_chunk))
+    start = 0
+    
+    while start < len(words):
+        offset = ends[start - 1] if start else 0
+        end = max(bisect_right(ends, offset + chunk_size, start), start + 1)
+        chunks.append(" ".join(words[start:end]))
+        start = end
     
     logger.info(f"Split text into {len(chunks)} chunks")
     
+    metadata = state.execution_metadata.copy()
+    metadata["chunks_created"] = len(chunks)
+    
     return state.copy_with_updates(
         chunks=chunks,
-        execution_metadata={
-            **state.execution_metadata,
-            "chunks_created": len(chunks)
-        }
+        execution_metadata=metadata
     )
 
 
@@ -64,13 +85,13 @@ def summarize_chunks(state: WorkflowState) -> WorkflowState:
     
     logger.info(f"Generated {len(summaries)} chunk summaries using frequency scoring")
     
+    metadata = state.execution_metadata.copy()
+    metadata["summaries_created"] = len(summaries)
+    metadata["summarization_method"] = "frequency_based_scoring"
+    
     return state.copy_with_updates(
         chunk_summaries=summaries,
-        execution_metadata={
-            **state.execution_metadata,
-            "summaries_created": len(summaries),
-            "summarization_method": "frequency_based_scoring"
-        }
+        execution_metadata=metadata
     )
 
 
@@ -84,19 +105,20 @@ def merge_summaries(state: WorkflowState) -> WorkflowState:
             current_length=0
         )
     
-    merged = ". ".join(s.strip().rstrip(".") for s in summaries if s.strip())
-    merged = merged + "."
+    # Strip each summary once; empty ones are skipped
+    stripped = filter(None, map(str.strip, summaries))
+    merged = ". ".join(s.rstrip(".") for s in stripped) + "."
     
     logger.info(f"Merged {len(summaries)} summaries into {len(merged)} chars")
     
+    metadata = state.execution_metadata.copy()
+    metadata["merged_length"] = len(merged)
+    
     return state.copy_with_updates(
         merged_summary=merged,
         current_length=len(merged),
         refined_summary=merged,
-        execution_metadata={
-            **state.execution_metadata,
-            "merged_length": len(merged)
-        }
+        execution_metadata=metadata
     )
 
 
@@ -104,56 +126,58 @@ def refine_summary(state: WorkflowState) -> WorkflowState:
     merged = state.merged_summary or state.text
     max_len = state.max_length
     
-    # Normalize spacing + fix periods
-    merged = merged.replace("..", ".")
-    parts = [p.strip() for p in merged.split(".") if p.strip()]
-    
-    parts = [p for p in parts if len(p.split()) >= 4]
-    
-    refined = ""
-    for p in parts:
-        if len(refined) + len(p) + 2 <= max_len:
-            refined = (refined + " " + p).strip()
-        else:
-            break
-    
-    if len(refined) > max_len:
-        refined = refined[:max_len].rsplit(" ", 1)[0]
-    
-    final_summary = refined + "."
+    if len(merged) <= _REFINE_CACHE_MAX_CHARS:
+        final_summary, merged_length = _refine_text_cached(merged, max_len)
+    else:
+        final_summary, merged_length = _refine_text(merged, max_len)
     new_length = len(final_summary)
     iterations = state.refinement_iterations + 1
     
     logger.info(
-        f"Rule-based refinement iteration {iterations}: {len(merged)} -> {new_length} chars "
-        f"(target: {max_len}, reduction: {len(merged) - new_length})"
+        f"Rule-based refinement iteration {iterations}: {merged_length} -> {new_length} chars "
+        f"(target: {max_len}, reduction: {merged_length - new_length})"
     )
     
+    metadata = state.execution_metadata.copy()
+    metadata[f"refinement_{iterations}_length"] = new_length
+    metadata[f"refinement_{iterations}_reduction"] = merged_length - new_length
+    
     return state.copy_with_updates(
         refined_summary=final_summary,
         current_length=new_length,
         refinement_iterations=iterations,
-        execution_metadata={
-            **state.execution_metadata,
-            f"refinement_{iterations}_length": new_length,
-            f"refinement_{iterations}_reduction": len(merged) - new_length
-        }
+        execution_metadata=metadata
     )
 
 
+def _refine_text(merged: str, max_len: int) -> Tuple[str, int]:
+    # Normalize spacing + fix periods
+    merged = merged.replace("..", ".")
+    
+    # Greedily keep sentences of 4+ words while they fit, tracking the
+    # joined length instead of rebuilding the string
+    selected: List[str] = []
+    total = 0
+    for p in merged.split("."):
+        if len(p.split(None, 3)) < 4:
+            continue
+        p = p.strip()
+        if total + len(p) + 2 > max_len:
+            break
+        total += len(p) + (1 if selected else 0)
+        selected.append(p)
+    
+    return " ".join(selected) + ".", len(merged)
+
 
+_refine_text_cached = lru_cache(maxsize=256)(_refine_text)
 
 
 def check_length_loop(state: WorkflowState) -> WorkflowState:
-    should_continue = (
-        state.current_length > state.max_length and
-        state.refinement_iterations < state.max_refinement_iterations
-    )
-    
     logger.info(
-        f"Length check: current={state.current_length}, "
-        f"max={state.max_length}, iterations={state.refinement_iterations}, "
-        f"should_loop={should_continue}"
+        "Length check: current=%d, max=%d, iterations=%d, should_loop=%s",
+        state.current_length, state.max_length, state.refinement_iterations,
+        state.needs_refinement()
     )
     
     return state
@@ -163,48 +187,49 @@ def _frequency_based_summarize(text: str) -> str:
     if not text or len(text) < 10:
         return text[:50] if text else ""
     
-    sentences = _extract_sentences(text)
+    fragments = [f.strip() for f in _SENT_SPLIT_RE.split(text)]
+    sentence_idx = [i for i, f in enumerate(fragments) if len(f) > 5]
     
-    if not sentences:
+    if not sentence_idx:
         return text[:50]
     
-    if len(sentences) == 1:
-        return _compress_sentence(sentences[0], max_words=16)
+    if len(sentence_idx) == 1:
+        return _compress_sentence(fragments[sentence_idx[0]], max_words=16)
     
-    word_freq = _calculate_word_frequencies(text)
+    # Lowercase the chunk once and tokenize its fragments; lowercasing never
+    # adds or removes sentence delimiters, so fragments line up by index.
+    # Frequencies also count the short fragments.
+    fragment_words = [_WORD_RE.findall(f) for f in _SENT_SPLIT_RE.split(text.lower())]
+    word_freq = _calculate_word_frequencies(fragment_words)
     
-    sentence_scores = []
-    for sentence in sentences:
-        score = _score_sentence(sentence, word_freq)
-        sentence_scores.append((score, sentence))
+    scores = [_score_sentence(fragment_words[i], word_freq) for i in sentence_idx]
+    best = max(range(len(scores)), key=scores.__getitem__)
     
-    sentence_scores.sort(reverse=True, key=lambda x: x[0])
-    best_sentence = sentence_scores[0][1]
+    compressed = _compress_sentence(fragments[sentence_idx[best]], max_words=16)
     
-    compressed = _compress_sentence(best_sentence, max_words=16)
-    
-    logger.debug(f"Selected sentence (score={sentence_scores[0][0]:.2f}): {compressed[:50]}...")
+    logger.debug("Selected sentence (score=%.2f): %s...", scores[best], compressed[:50])
     
     return compressed
 
 
-def _extract_sentences(text: str) -> List[str]:
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip() and len(s.strip()) > 5]
-    return sentences
-
-
-def _calculate_word_frequencies(text: str) -> Dict[str, int]:
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-    stopwords = _get_stopwords()
-    words = [w for w in words if w not in stopwords]
-    word_freq = Counter(words)
-    return dict(word_freq)
+def _calculate_word_frequencies(fragment_words: List[List[str]]) -> Dict[str, int]:
+    if sum(map(len, fragment_words)) >= _COUNTER_MIN_WORDS:
+        # Count everything in C, then drop the few stopwords that occurred
+        word_freq = Counter(chain.from_iterable(fragment_words))
+        for word in _STOPWORDS.intersection(word_freq):
+            del word_freq[word]
+        return word_freq
+    
+    word_freq = {}
+    for words in fragment_words:
+        for word in words:
+            if word in _STOPWORDS:
+                continue
+            word_freq[word] = word_freq.get(word, 0) + 1
+    return word_freq
 
 
-def _score_sentence(sentence: str, word_freq: Dict[str, int]) -> float:
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', sentence.lower())
-    
+def _score_sentence(words: List[str], word_freq: Dict[str, int]) -> float:
     if not words:
         return 0.0
     
@@ -224,22 +249,3 @@ def _compress_sentence(sentence: str, max_words: int = 16) -> str:
     compressed = " ".join(compressed_words)
     
     return compressed.strip()
-
-
-def _get_stopwords() -> set:
-    return {
-        'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-        'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
-        'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
-        'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that',
-        'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
-        'what', 'which', 'who', 'when', 'where', 'why', 'how', 'all', 'each',
-        'every', 'both', 'few', 'more', 'most', 'other', 'some', 'such',
-        'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than', 'too',
-        'very', 'just', 'also', 'into', 'through', 'during', 'before',
-        'after', 'above', 'below', 'between', 'under', 'again', 'further',
-        'then', 'once', 'here', 'there', 'all', 'any', 'both', 'each',
-        'more', 'most', 'other', 'some', 'such', 'their', 'them', 'they',
-        'about', 'against', 'because', 'being', 'down', 'off', 'over',
-        'up', 'out', 'until', 'while', 'your'
-    }